@@ -1,6 +1,11 @@
 """Adaptive learning from on-chain events."""
 
+from collections import deque
 from dataclasses import dataclass, field
+from functools import cached_property
+
+# Number of recent batches used to adapt k
+RECENT_WINDOW = 10
 
 
 @dataclass
@@ -16,6 +21,20 @@ class BatchResult:
     price_at_entry: float = 0.0
     price_at_check: float = 0.0
 
+    @cached_property
+    def lower_price(self) -> float:
+        """Price at tick_lower."""
+        from .optimizer import tick_to_price
+
+        return tick_to_price(self.tick_lower)
+
+    @cached_property
+    def upper_price(self) -> float:
+        """Price at tick_upper."""
+        from .optimizer import tick_to_price
+
+        return tick_to_price(self.tick_upper)
+
 
 @dataclass
 class AdaptiveParams:
@@ -26,10 +45,21 @@ class AdaptiveParams:
     max_k: float = 5.0
     learning_rate: float = 0.1
     history: list[BatchResult] = field(default_factory=list)
+    # Running aggregates over history, maintained by record_batch
+    _recent_il: deque = field(
+        default_factory=lambda: deque(maxlen=RECENT_WINDOW), init=False, repr=False, compare=False
+    )
+    _total_gas: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._recent_il.extend(self.calculate_il_score(r) for r in self.history[-RECENT_WINDOW:])
+        self._total_gas = sum(r.gas_used for r in self.history)
 
     def record_batch(self, result: BatchResult):
         """Record a batch result for learning."""
         self.history.append(result)
+        self._recent_il.append(self.calculate_il_score(result))
+        self._total_gas += result.gas_used
 
     def calculate_il_score(self, result: BatchResult) -> float:
         """Calculate a simplified impermanent loss score.
@@ -43,13 +73,8 @@ class AdaptiveParams:
         price_ratio = result.price_at_check / result.price_at_entry
 
         # Check if price moved outside the range
-        from .optimizer import tick_to_price
-
-        lower_price = tick_to_price(result.tick_lower)
-        upper_price = tick_to_price(result.tick_upper)
-
         current_price = result.price_at_check
-        if current_price < lower_price or current_price > upper_price:
+        if current_price < result.lower_price or current_price > result.upper_price:
             return 1.0  # Price moved outside range - maximum IL indicator
 
         # IL approximation: 2*sqrt(price_ratio) / (1 + price_ratio) - 1
@@ -67,8 +92,7 @@ class AdaptiveParams:
             return
 
         # Use last N batches
-        recent = self.history[-10:]
-        il_scores = [self.calculate_il_score(r) for r in recent]
+        il_scores = self._recent_il
         avg_il = sum(il_scores) / len(il_scores) if il_scores else 0.0
 
         # Target: keep IL score around 0.3 (moderate)
@@ -82,12 +106,11 @@ class AdaptiveParams:
 
     def get_stats(self) -> dict:
         """Return current adaptive stats."""
-        recent = self.history[-10:]
-        il_scores = [self.calculate_il_score(r) for r in recent] if recent else []
+        il_scores = self._recent_il
 
         return {
             "k_multiplier": round(self.k_multiplier, 4),
             "total_batches": len(self.history),
             "recent_avg_il": round(sum(il_scores) / len(il_scores), 6) if il_scores else 0.0,
-            "total_gas": sum(r.gas_used for r in self.history),
+            "total_gas": self._total_gas,
         }
@@ -1,13 +1,18 @@
 """Intent collection API (FastAPI)."""
 
 import json
+import threading
 import time
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
 
-from .types import LPIntentRequest, BatchStatus, LPIntent
-from .signer import verify_intent_signature
+from .types import LPIntentRequest, BatchStatus, BatchRecord, LPIntent, PendingIntent
+from .merkle import MerkleTree, compute_leaf, compute_leaves
+from .signer import verify_intent_signature_fast
 
 HISTORY_FILE = Path(__file__).parent.parent / "batch_history.json"
 
@@ -19,6 +24,12 @@ class IntentCollector:
         self.chain_id = chain_id
         self.verifying_contract = verifying_contract
         self.pending_intents: list[tuple[LPIntent, bytes]] = []  # (intent, signature)
+        # (user, nonce) of every pending intent, for O(1) duplicate checks
+        self._nonce_index: set[tuple[str, int]] = set()
+        # Merkle tree over pending_intents, grown one leaf per accepted intent
+        self._pending_tree: MerkleTree | None = None
+        # Guards pending_intents: API handlers and the batch loop touch it concurrently
+        self._lock = threading.Lock()
         self.batches_executed = 0
         self.last_batch_root: str | None = None
         self.last_batch_tx: str | None = None
@@ -26,43 +37,60 @@ class IntentCollector:
 
     def submit_intent(self, request: LPIntentRequest) -> dict:
         """Validate and store a signed intent."""
-        intent = request.to_lp_intent()
+        try:
+            intent = request.to_lp_intent()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid address: {e}")
         signature = bytes.fromhex(request.signature.removeprefix("0x"))
 
         # Validate deadline
         if intent.deadline < int(time.time()):
             raise HTTPException(status_code=400, detail="Intent deadline has passed")
 
+        # Reject replays before paying for signature recovery. The set lookup
+        # needs no lock; the authoritative check is repeated under it below.
+        key = (intent.user.lower(), intent.nonce)
+        if key in self._nonce_index:
+            raise HTTPException(status_code=400, detail="Duplicate nonce")
+
+        # Encode the struct first: out-of-range ticks or fees would be accepted
+        # here but could never be ABI-encoded into executeBatch
+        try:
+            leaf = compute_leaf(intent)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid intent: {e}")
+
         # Verify signature
         try:
-            recovered = verify_intent_signature(
+            recovered = verify_intent_signature_fast(
                 intent, signature, self.chain_id, self.verifying_contract
             )
-            if recovered.lower() != intent.user.lower():
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Signature mismatch: recovered {recovered}, expected {intent.user}",
-                )
         except Exception as e:
-            if isinstance(e, HTTPException):
-                raise
             raise HTTPException(status_code=400, detail=f"Invalid signature: {e}")
 
-        # Check for duplicate nonce
-        for existing_intent, _ in self.pending_intents:
-            if (
-                existing_intent.user.lower() == intent.user.lower()
-                and existing_intent.nonce == intent.nonce
-            ):
+        if recovered.lower() != intent.user.lower():
+            raise HTTPException(
+                status_code=400,
+                detail=f"Signature mismatch: recovered {recovered}, expected {intent.user}",
+            )
+
+        with self._lock:
+            # Check for duplicate nonce
+            if key in self._nonce_index:
                 raise HTTPException(status_code=400, detail="Duplicate nonce")
 
-        self.pending_intents.append((intent, signature))
-        return {"status": "accepted", "pending_count": len(self.pending_intents)}
+            self._nonce_index.add(key)
+            self.pending_intents.append((intent, signature))
+            self._append_leaf(leaf)
+            pending_count = len(self.pending_intents)
+        return {"status": "accepted", "pending_count": pending_count}
 
     def get_pending(self) -> list[dict]:
         """Return pending intents."""
+        with self._lock:
+            pending = list(self.pending_intents)
         result = []
-        for intent, sig in self.pending_intents:
+        for intent, sig in pending:
             result.append(
                 {
                     "user": intent.user,
@@ -77,8 +105,14 @@ class IntentCollector:
 
     def get_status(self) -> BatchStatus:
         """Return current batch status."""
+        with self._lock:
+            # Count and root from the same snapshot, so they always describe one queue
+            pending_count = len(self.pending_intents)
+            tree = self._pending_tree
+            pending_root = "0x" + tree.root.hex() if tree is not None else None
         return BatchStatus(
-            pending_intents=len(self.pending_intents),
+            pending_intents=pending_count,
+            pending_root=pending_root,
             last_batch_root=self.last_batch_root,
             last_batch_tx=self.last_batch_tx,
             batches_executed=self.batches_executed,
@@ -86,9 +120,41 @@ class IntentCollector:
 
     def drain_pending(self) -> list[tuple[LPIntent, bytes]]:
         """Remove and return all pending intents for batching."""
-        intents = list(self.pending_intents)
-        self.pending_intents.clear()
-        return intents
+        return self.drain_batch()[0]
+
+    def drain_batch(self) -> tuple[list[tuple[LPIntent, bytes]], MerkleTree | None]:
+        """Remove and return all pending intents, with the Merkle tree over them."""
+        with self._lock:
+            intents = list(self.pending_intents)
+            tree = self._pending_tree
+            self.pending_intents.clear()
+            self._nonce_index.clear()
+            self._pending_tree = None
+        return intents, tree
+
+    def requeue(self, intents: list[tuple[LPIntent, bytes]]):
+        """Put drained intents back in the queue (e.g. after a failed batch).
+
+        An intent whose (user, nonce) was resubmitted while its batch was in
+        flight is already queued again, so the drained copy is dropped.
+        """
+        leaves = compute_leaves([intent for intent, _ in intents])
+        with self._lock:
+            for entry, leaf in zip(intents, leaves):
+                intent = entry[0]
+                key = (intent.user.lower(), intent.nonce)
+                if key in self._nonce_index:
+                    continue
+                self._nonce_index.add(key)
+                self.pending_intents.append(entry)
+                self._append_leaf(leaf)
+
+    def _append_leaf(self, leaf: bytes):
+        """Add a leaf to the pending tree. Caller must hold self._lock."""
+        if self._pending_tree is None:
+            self._pending_tree = MerkleTree([leaf])
+        else:
+            self._pending_tree.append(leaf)
 
     def record_batch(self, root: str, tx_hash: str, intent_count: int = 0):
         """Record a completed batch."""
@@ -129,9 +195,9 @@ class IntentCollector:
             pass
 
 
-def create_app(collector: IntentCollector, config=None, adaptive=None) -> FastAPI:
+def create_app(collector: IntentCollector, config=None, adaptive=None, lifespan=None) -> FastAPI:
     """Create the FastAPI application."""
-    app = FastAPI(title="PrivBatch Agent", version="0.1.0")
+    app = FastAPI(title="PrivBatch Agent", version="0.1.0", lifespan=lifespan)
 
     # CORS for Next.js frontend (allow all for demo)
     app.add_middleware(
@@ -142,20 +208,42 @@ def create_app(collector: IntentCollector, config=None, adaptive=None) -> FastAP
         allow_headers=["*"],
     )
 
-    @app.post("/intents")
-    def submit_intent(request: LPIntentRequest):
-        return collector.submit_intent(request)
+    # The body is parsed straight from raw bytes by Pydantic's JSON parser,
+    # skipping the stdlib json.loads + dict validation round trip; the schema
+    # is declared by hand so the OpenAPI docs still describe it
+    @app.post(
+        "/intents",
+        openapi_extra={
+            "requestBody": {
+                "content": {"application/json": {"schema": LPIntentRequest.model_json_schema()}},
+                "required": True,
+            }
+        },
+    )
+    async def submit_intent(request: Request):
+        try:
+            intent_request = LPIntentRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+        # Signature recovery runs in libsecp256k1 without the GIL; do it on the
+        # threadpool so concurrent submissions verify in parallel instead of
+        # blocking the event loop one at a time
+        return await run_in_threadpool(collector.submit_intent, intent_request)
 
+    # Declared return types let FastAPI serialize straight to JSON bytes via
+    # Pydantic instead of walking the data with jsonable_encoder first
     @app.get("/intents/pending")
-    def get_pending():
+    async def get_pending() -> list[PendingIntent]:
         return collector.get_pending()
 
     @app.get("/batch/status")
-    def get_status():
+    async def get_status() -> BatchStatus:
         return collector.get_status()
 
     @app.get("/config")
-    def get_config():
+    async def get_config():
         if config is None:
             return {"error": "Config not available"}
         return {
@@ -181,7 +269,7 @@ def create_app(collector: IntentCollector, config=None, adaptive=None) -> FastAP
         }
 
     @app.get("/optimizer/suggest")
-    def suggest_range(
+    async def suggest_range(
         price: float = Query(default=1.0, description="Current price"),
         volatility: float = Query(default=0.05, description="Annualized volatility"),
     ):
@@ -198,13 +286,13 @@ def create_app(collector: IntentCollector, config=None, adaptive=None) -> FastAP
         }
 
     @app.get("/adaptive/stats")
-    def get_adaptive_stats():
+    async def get_adaptive_stats():
         if adaptive is None:
             return {"k_multiplier": 2.0, "total_batches": 0, "recent_avg_il": 0.0, "total_gas": 0}
         return adaptive.get_stats()
 
     @app.get("/batch/history")
-    def get_batch_history():
+    async def get_batch_history() -> list[BatchRecord]:
         return collector.batch_history
 
     return app
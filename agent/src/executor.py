@@ -1,22 +1,35 @@
 """Batch submission via web3 transactions."""
 
 import json
+import time
 from pathlib import Path
 from eth_abi import encode
 from web3 import Web3
 
 from .types import LPIntent
-from .merkle import MerkleTree, compute_leaf
+from .merkle import MerkleTree, compute_leaves
+
+# How long a fetched gas price is reused before asking the node again
+GAS_PRICE_TTL_SECONDS = 5.0
+
+
+# ABIs loaded so far; a missing artifact is not cached, so a later forge build is picked up
+_abi_cache: dict[str, list] = {}
 
 
 # Load ABI from forge artifacts
 def _load_abi(contract_name: str) -> list:
-    """Load ABI from forge output."""
+    """Load ABI from forge output (read once per process; do not mutate the result)."""
+    abi = _abi_cache.get(contract_name)
+    if abi is not None:
+        return abi
     out_dir = Path(__file__).parent.parent.parent / "out"
     artifact_path = out_dir / f"{contract_name}.sol" / f"{contract_name}.json"
     if artifact_path.exists():
         with open(artifact_path) as f:
-            return json.load(f)["abi"]
+            abi = json.load(f)["abi"]
+        _abi_cache[contract_name] = abi
+        return abi
     return []
 
 
@@ -31,36 +44,66 @@ class BatchSubmitter:
         abi = _load_abi("BatchExecutor")
         self.executor = w3.eth.contract(address=executor_address, abi=abi)
 
+        # Account nonce, tracked locally after the first fetch
+        self._nonce: int | None = None
+        self._gas_price = 0
+        self._gas_price_fetched_at = float("-inf")
+
+    def _next_nonce(self) -> int:
+        """Return the nonce for the next transaction, fetching it only once."""
+        if self._nonce is None:
+            self._nonce = self.w3.eth.get_transaction_count(self.account.address)
+        return self._nonce
+
+    def _current_gas_price(self) -> int:
+        """Return the node's gas price, cached for GAS_PRICE_TTL_SECONDS."""
+        now = time.monotonic()
+        if now - self._gas_price_fetched_at > GAS_PRICE_TTL_SECONDS:
+            self._gas_price = self.w3.eth.gas_price
+            self._gas_price_fetched_at = now
+        return self._gas_price
+
     def build_batch_tx(
         self,
         intents: list[LPIntent],
         signatures: list[bytes],
-    ) -> dict:
-        """Build the executeBatch transaction."""
+        tree: MerkleTree | None = None,
+    ) -> tuple[dict, str]:
+        """Build the executeBatch transaction. Returns (tx, batch root hex).
+
+        Intent addresses must already be checksummed, as done at intake by
+        LPIntentRequest.to_lp_intent. If the caller already holds the Merkle
+        tree over these intents (e.g. the collector's running tree), pass it
+        to skip rebuilding it.
+        """
         # Compute Merkle tree
-        leaves = [compute_leaf(intent) for intent in intents]
-        tree = MerkleTree(leaves)
-        proofs = [tree.get_proof(i) for i in range(len(intents))]
+        if tree is None:
+            tree = MerkleTree(compute_leaves(intents))
+        elif len(tree.leaves) != len(intents):
+            raise ValueError(
+                f"Merkle tree has {len(tree.leaves)} leaves for {len(intents)} intents"
+            )
+        proofs = tree.all_proofs()
 
         # Convert intents to the tuple format expected by the contract
-        intent_tuples = []
-        for intent in intents:
-            pool_tuple = (
-                Web3.to_checksum_address(intent.pool.currency0),
-                Web3.to_checksum_address(intent.pool.currency1),
-                intent.pool.fee,
-                intent.pool.tick_spacing,
-                Web3.to_checksum_address(intent.pool.hooks),
-            )
-            intent_tuples.append((
-                Web3.to_checksum_address(intent.user),
-                pool_tuple,
+        intent_tuples = [
+            (
+                intent.user,
+                (
+                    intent.pool.currency0,
+                    intent.pool.currency1,
+                    intent.pool.fee,
+                    intent.pool.tick_spacing,
+                    intent.pool.hooks,
+                ),
                 intent.tick_lower,
                 intent.tick_upper,
                 intent.amount,
                 intent.nonce,
                 intent.deadline,
-            ))
+            )
+            for intent in intents
+        ]
 
         # Build transaction
         tx = self.executor.functions.executeBatch(
@@ -69,31 +112,38 @@ class BatchSubmitter:
             proofs,
         ).build_transaction({
             "from": self.account.address,
-            "nonce": self.w3.eth.get_transaction_count(self.account.address),
+            "nonce": self._next_nonce(),
             "gas": 3_000_000,
-            "gasPrice": self.w3.eth.gas_price,
+            "gasPrice": self._current_gas_price(),
         })
 
-        return tx
+        return tx, "0x" + tree.root.hex()
 
     def submit_batch(
         self,
         intents: list[LPIntent],
         signatures: list[bytes],
-    ) -> str:
-        """Build, sign, and submit a batch transaction. Returns tx hash."""
-        tx = self.build_batch_tx(intents, signatures)
+        tree: MerkleTree | None = None,
+    ) -> tuple[str, str]:
+        """Build, sign, and submit a batch transaction. Returns (tx hash, batch root)."""
+        tx, batch_root = self.build_batch_tx(intents, signatures, tree)
         signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            # Our view of the nonce may be stale; re-sync on the next batch
+            self._nonce = None
+            raise
+        self._nonce = tx["nonce"] + 1
         receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
 
         if receipt["status"] != 1:
             raise RuntimeError(f"Batch transaction failed: {tx_hash.hex()}")
 
-        return tx_hash.hex()
+        return tx_hash.hex(), batch_root
 
     def get_batch_root(self, intents: list[LPIntent]) -> str:
         """Compute the batch Merkle root."""
-        leaves = [compute_leaf(intent) for intent in intents]
+        leaves = compute_leaves(intents)
         tree = MerkleTree(leaves)
         return "0x" + tree.root.hex()
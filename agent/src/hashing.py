@@ -0,0 +1,60 @@
+"""Keccak-256 hashing on the fastest available backend."""
+
+import os
+
+try:
+    import sha3  # pysha3 / safe-pysha3: C Keccak, much faster than eth_hash's default
+except ImportError:  # pysha3 is an optional speedup
+    sha3 = None
+
+if sha3 is not None:
+    # Route eth_hash consumers (eth_account, web3) through pysha3 as well. eth_hash
+    # picks its backend lazily on first use, so this must run before any hashing.
+    os.environ.setdefault("ETH_HASH_BACKEND", "pysha3")
+
+    _keccak_256 = sha3.keccak_256
+
+    # Copying an empty hasher is cheaper than constructing a new one
+    _new_keccak_256 = _keccak_256().copy
+
+    def keccak(data: bytes) -> bytes:
+        """Return the Keccak-256 digest of data."""
+        return _keccak_256(data).digest()
+
+    def keccak_pair(left: bytes, right: bytes) -> bytes:
+        """Return the Keccak-256 digest of left || right without concatenating them."""
+        hasher = _new_keccak_256()
+        hasher.update(left)
+        hasher.update(right)
+        return hasher.digest()
+
+    def keccak_sorted_pair(a: bytes, b: bytes) -> bytes:
+        """Return the Keccak-256 digest of the two inputs in sorted order (OpenZeppelin)."""
+        hasher = _new_keccak_256()
+        if a <= b:
+            hasher.update(a)
+            hasher.update(b)
+        else:
+            hasher.update(b)
+            hasher.update(a)
+        return hasher.digest()
+
+else:
+    from eth_hash.auto import keccak as _eth_hash_keccak
+
+    # eth_hash resolves its backend on the first call; after that, bind the
+    # backend's hash function directly and skip the per-call type check and
+    # dispatch of the eth_hash.auto wrapper
+    _eth_hash_keccak(b"")
+    keccak = _eth_hash_keccak.hasher
+
+    # The backend takes a single input, so the pair is concatenated. Copying
+    # both halves into a reused 64-byte buffer measures slower than the
+    # concatenation, and a shared buffer would not be thread-safe.
+    def keccak_pair(left: bytes, right: bytes) -> bytes:
+        """Return the Keccak-256 digest of left || right."""
+        return keccak(left + right)
+
+    def keccak_sorted_pair(a: bytes, b: bytes) -> bytes:
+        """Return the Keccak-256 digest of the two inputs in sorted order (OpenZeppelin)."""
+        return keccak(a + b) if a <= b else keccak(b + a)
@@ -1,10 +1,11 @@
 """Main orchestrator: collect -> optimize -> build tree -> execute."""
 
 import asyncio
+import contextlib
 import logging
 import time
-import threading
 
+import requests
 import uvicorn
 from web3 import Web3
 
@@ -27,7 +28,9 @@ class PrivBatchAgent:
         self.config = config
         self.collector = IntentCollector(config.chain_id, config.hook_address)
         self.adaptive = AdaptiveParams(k_multiplier=config.k_multiplier)
-        self.app = create_app(self.collector, config=config, adaptive=self.adaptive)
+        self.app = create_app(
+            self.collector, config=config, adaptive=self.adaptive, lifespan=self._lifespan
+        )
         self.running = False
 
         # Web3 connection (lazy)
@@ -37,7 +40,8 @@ class PrivBatchAgent:
     @property
     def w3(self) -> Web3:
         if self._w3 is None:
-            self._w3 = Web3(Web3.HTTPProvider(self.config.rpc_url))
+            # Keep one pooled HTTP session for every RPC call the agent makes
+            self._w3 = Web3(Web3.HTTPProvider(self.config.rpc_url, session=requests.Session()))
         return self._w3
 
     @property
@@ -55,10 +59,13 @@ class PrivBatchAgent:
 
         Returns the transaction hash if a batch was submitted, None otherwise.
         """
-        pending = self.collector.drain_pending()
+        if len(self.collector.pending_intents) < self.config.min_batch_size:
+            return None
+
+        pending, tree = self.collector.drain_batch()
         if len(pending) < self.config.min_batch_size:
             # Put them back if not enough
-            self.collector.pending_intents.extend(pending)
+            self.collector.requeue(pending)
             return None
 
         intents = [p[0] for p in pending]
@@ -67,8 +74,7 @@ class PrivBatchAgent:
         logger.info(f"Processing batch of {len(intents)} intents")
 
         try:
-            tx_hash = self.submitter.submit_batch(intents, signatures)
-            batch_root = self.submitter.get_batch_root(intents)
+            tx_hash, batch_root = self.submitter.submit_batch(intents, signatures, tree)
 
             self.collector.record_batch(batch_root, tx_hash, len(intents))
             logger.info(f"Batch submitted: root={batch_root}, tx={tx_hash}")
@@ -90,31 +96,40 @@ class PrivBatchAgent:
         except Exception as e:
             logger.error(f"Batch submission failed: {e}")
             # Put intents back
-            self.collector.pending_intents.extend(pending)
+            self.collector.requeue(pending)
             return None
 
-    def _batch_loop(self):
-        """Background loop that checks for batches."""
+    async def _batch_loop(self):
+        """Background task that checks for batches."""
         while self.running:
             try:
-                self.process_batch()
+                # process_batch blocks on web3 IO; keep it off the event loop
+                await asyncio.to_thread(self.process_batch)
             except Exception as e:
                 logger.error(f"Batch loop error: {e}")
-            time.sleep(self.config.batch_check_interval)
+            await asyncio.sleep(self.config.batch_check_interval)
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app):
+        """Run the batch loop as a task on the API server's event loop."""
+        task = asyncio.create_task(self._batch_loop())
+        try:
+            yield
+        finally:
+            self.running = False
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
 
     def start(self):
         """Start the agent (API server + batch processing loop)."""
         self.running = True
 
-        # Start batch processing in background thread
-        batch_thread = threading.Thread(target=self._batch_loop, daemon=True)
-        batch_thread.start()
-
         logger.info(
             f"PrivBatch Agent starting on {self.config.api_host}:{self.config.api_port}"
         )
 
-        # Start API server (blocks)
+        # Start API server (blocks); the batch loop starts with it via _lifespan
         uvicorn.run(
             self.app,
             host=self.config.api_host,
@@ -175,7 +190,7 @@ def _run_test_mode(config: Config):
     logger.info("=== PrivBatch Agent Test Mode ===")
 
     # Connect to Anvil
-    w3 = Web3(Web3.HTTPProvider(config.rpc_url))
+    w3 = Web3(Web3.HTTPProvider(config.rpc_url, session=requests.Session()))
     if not w3.is_connected():
         logger.error(f"Cannot connect to {config.rpc_url}. Is Anvil running?")
         return
@@ -1,51 +1,152 @@
 """Merkle tree builder and proof generation for intent batches."""
 
-from eth_abi import encode
-from web3 import Web3
+from functools import lru_cache
 
+from .hashing import keccak as _keccak, keccak_sorted_pair
 
-def _hash_pair(a: bytes, b: bytes) -> bytes:
-    """Hash two nodes, sorting them first (OpenZeppelin standard)."""
-    if a <= b:
-        return Web3.keccak(a + b)
-    else:
-        return Web3.keccak(b + a)
+# Hash two nodes, sorting them first (OpenZeppelin standard). Bound directly to
+# the hashing backend so each internal node costs a single Python call.
+_hash_pair = keccak_sorted_pair
 
 
-def _hash_pool_key(pool) -> bytes:
-    """Hash a PoolKey struct matching Solidity's IntentVerifier.hashPoolKey."""
-    pool_key_typehash = Web3.keccak(
-        text="PoolKey(address currency0,address currency1,uint24 fee,int24 tickSpacing,address hooks)"
+def _hash_level(layer: list[bytes]) -> list[bytes]:
+    """Hash every adjacent pair of a layer into the next one up.
+
+    An odd trailing node is promoted as-is. All pairs of a level are
+    independent, so this is the one place a batched Keccak would plug in.
+    """
+    hash_pair = _hash_pair
+    it = iter(layer)
+    next_layer = [hash_pair(a, b) for a, b in zip(it, it)]
+    if len(layer) % 2:
+        next_layer.append(layer[-1])
+    return next_layer
+
+
+POOL_KEY_TYPEHASH = _keccak(
+    b"PoolKey(address currency0,address currency1,uint24 fee,int24 tickSpacing,address hooks)"
+)
+
+LP_INTENT_TYPEHASH = _keccak(
+    b"LPIntent(address user,PoolKey pool,int24 tickLower,int24 tickUpper,uint256 amount,uint256 nonce,uint256 deadline)PoolKey(address currency0,address currency1,uint24 fee,int24 tickSpacing,address hooks)"
+)
+
+
+@lru_cache(maxsize=4096)
+def _address_word(address: str) -> bytes:
+    """ABI-encode an address as a left-padded 32-byte word.
+
+    Cached, since the same users keep submitting intents.
+    """
+    raw = bytes.fromhex(address.removeprefix("0x"))
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address: {address}")
+    return raw.rjust(32, b"\x00")
+
+
+def _int_word(value: int) -> bytes:
+    """ABI-encode a signed integer (int24) as a sign-extended 32-byte word."""
+    return value.to_bytes(32, "big", signed=True)
+
+
+def _uint_word(value: int) -> bytes:
+    """ABI-encode an unsigned integer (uint24/uint256) as a 32-byte word."""
+    return value.to_bytes(32, "big")
+
+
+# Solidity ranges of the fixed-width struct fields; hand-packing would otherwise
+# happily encode values that executeBatch cannot
+INT24_MIN = -(2**23)
+INT24_MAX = 2**23 - 1
+UINT24_MAX = 2**24 - 1
+UINT256_MAX = 2**256 - 1
+
+
+# Distinct pools kept hashed; a coordinator typically serves only a handful
+POOL_KEY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=POOL_KEY_CACHE_SIZE)
+def _hash_pool_key(
+    currency0: str, currency1: str, fee: int, tick_spacing: int, hooks: str
+) -> bytes:
+    """Hash a PoolKey struct matching Solidity's IntentVerifier.hashPoolKey.
+
+    Cached per pool, since every intent in a batch usually targets the same one.
+    Raises ValueError if fee or tick_spacing is out of range.
+    """
+    if not 0 <= fee <= UINT24_MAX:
+        raise ValueError(f"fee out of uint24 range: {fee}")
+    if not INT24_MIN <= tick_spacing <= INT24_MAX:
+        raise ValueError(f"tick_spacing out of int24 range: {tick_spacing}")
+    return _keccak(
+        b"".join(
+            (
+                POOL_KEY_TYPEHASH,
+                _address_word(currency0),
+                _address_word(currency1),
+                _uint_word(fee),
+                _int_word(tick_spacing),
+                _address_word(hooks),
+            )
+        )
     )
-    encoded = encode(
-        ["bytes32", "address", "address", "uint24", "int24", "address"],
-        [pool_key_typehash, pool.currency0, pool.currency1, pool.fee, pool.tick_spacing, pool.hooks],
+
+
+def _pack_lp_intent(intent, pool_hash: bytes) -> bytes:
+    """ABI-encode an LPIntent struct for hashing: its typehash and seven 32-byte words.
+
+    The layout never changes, so the integer fields are converted inline at
+    their fixed positions instead of going through eth_abi.encode or the
+    per-word helpers. Raises ValueError if a field is out of its Solidity range.
+    """
+    if not (
+        INT24_MIN <= intent.tick_lower <= INT24_MAX
+        and INT24_MIN <= intent.tick_upper <= INT24_MAX
+    ):
+        raise ValueError(
+            f"Ticks out of int24 range: [{intent.tick_lower}, {intent.tick_upper}]"
+        )
+    if not (
+        0 <= intent.amount <= UINT256_MAX
+        and 0 <= intent.nonce <= UINT256_MAX
+        and 0 <= intent.deadline <= UINT256_MAX
+    ):
+        raise ValueError("amount, nonce and deadline must be in uint256 range")
+    return b"".join(
+        (
+            LP_INTENT_TYPEHASH,
+            _address_word(intent.user),
+            pool_hash,
+            intent.tick_lower.to_bytes(32, "big", signed=True),
+            intent.tick_upper.to_bytes(32, "big", signed=True),
+            intent.amount.to_bytes(32, "big"),
+            intent.nonce.to_bytes(32, "big"),
+            intent.deadline.to_bytes(32, "big"),
+        )
     )
-    return Web3.keccak(encoded)
 
 
 def compute_leaf(intent) -> bytes:
-    """Compute a Merkle leaf from an LPIntent, matching Solidity's IntentVerifier.hashIntent."""
-    lp_intent_typehash = Web3.keccak(
-        text="LPIntent(address user,PoolKey pool,int24 tickLower,int24 tickUpper,uint256 amount,uint256 nonce,uint256 deadline)PoolKey(address currency0,address currency1,uint24 fee,int24 tickSpacing,address hooks)"
-    )
+    """Compute a Merkle leaf from an LPIntent, matching Solidity's IntentVerifier.hashIntent.
 
-    pool_hash = _hash_pool_key(intent.pool)
+    The result is cached on the (immutable) intent.
+    """
+    if intent._leaf is not None:
+        return intent._leaf
 
-    encoded = encode(
-        ["bytes32", "address", "bytes32", "int24", "int24", "uint256", "uint256", "uint256"],
-        [
-            lp_intent_typehash,
-            intent.user,
-            pool_hash,
-            intent.tick_lower,
-            intent.tick_upper,
-            intent.amount,
-            intent.nonce,
-            intent.deadline,
-        ],
+    pool = intent.pool
+    pool_hash = _hash_pool_key(
+        pool.currency0, pool.currency1, pool.fee, pool.tick_spacing, pool.hooks
     )
-    return Web3.keccak(encoded)
+    leaf = _keccak(_pack_lp_intent(intent, pool_hash))
+    object.__setattr__(intent, "_leaf", leaf)
+    return leaf
+
+
+def compute_leaves(intents: list) -> list[bytes]:
+    """Compute the Merkle leaves for a batch of intents, in order."""
+    return [compute_leaf(intent) for intent in intents]
 
 
 class MerkleTree:
@@ -54,25 +155,48 @@ class MerkleTree:
     def __init__(self, leaves: list[bytes]):
         if not leaves:
             raise ValueError("Cannot build tree with no leaves")
-        self.leaves = list(leaves)
-        self.layers: list[list[bytes]] = []
+        self.layers: list[list[bytes]] = [list(leaves)]
+        # Snapshot of one layer for short-proof verification (see cache_layer)
+        self._cached_depth = 0
+        self._cached_layer: list[bytes] | None = None
         self._build()
 
-    def _build(self):
-        """Build the tree bottom-up."""
-        layer = list(self.leaves)
-        self.layers.append(list(layer))
+    @property
+    def leaves(self) -> list[bytes]:
+        """The leaf layer (layers[0]); not a copy."""
+        return self.layers[0]
 
+    def _build(self):
+        """Build the tree bottom-up from the leaf layer."""
+        layer = self.layers[0]
         while len(layer) > 1:
-            next_layer = []
-            n = len(layer)
-            for i in range(0, n, 2):
-                if i + 1 < n:
-                    next_layer.append(_hash_pair(layer[i], layer[i + 1]))
-                else:
-                    next_layer.append(layer[i])
-            layer = next_layer
-            self.layers.append(list(layer))
+            layer = _hash_level(layer)
+            self.layers.append(layer)
+
+    def append(self, leaf: bytes):
+        """Append a leaf, rehashing only the rightmost path (O(log N)).
+
+        Only the last node of each layer depends on the new leaf, so the
+        result is identical to rebuilding the tree from all leaves.
+        """
+        self.layers[0].append(leaf)
+
+        level = 0
+        idx = len(self.layers[0]) - 1
+        while len(self.layers[level]) > 1:
+            layer = self.layers[level]
+            # Odd index: hash with the left sibling; even: promoted unpaired
+            parent = _hash_pair(layer[idx - 1], layer[idx]) if idx % 2 else layer[idx]
+
+            if level + 1 == len(self.layers):
+                self.layers.append([])
+            upper = self.layers[level + 1]
+            idx //= 2
+            if idx < len(upper):
+                upper[idx] = parent
+            else:
+                upper.append(parent)
+            level += 1
 
     @property
     def root(self) -> bytes:
@@ -80,13 +204,17 @@ class MerkleTree:
 
     def get_proof(self, index: int) -> list[bytes]:
         """Get the Merkle proof for the leaf at the given index."""
+        return self._proof(index, len(self.layers) - 1)
+
+    def _proof(self, index: int, depth: int) -> list[bytes]:
+        """Siblings of a leaf's path over the bottom `depth` layers."""
         if index < 0 or index >= len(self.leaves):
             raise IndexError(f"Leaf index {index} out of range")
 
         proof = []
         idx = index
 
-        for layer in self.layers[:-1]:
+        for layer in self.layers[:depth]:
             n = len(layer)
             if idx % 2 == 0:
                 # sibling is to the right
@@ -99,9 +227,56 @@ class MerkleTree:
 
         return proof
 
+    def all_proofs(self) -> list[list[bytes]]:
+        """Get the Merkle proofs for every leaf in a single sweep over the layers."""
+        proofs: list[list[bytes]] = [[] for _ in self.leaves]
+        indices = list(range(len(self.leaves)))
+
+        for layer in self.layers[:-1]:
+            n = len(layer)
+            for i, idx in enumerate(indices):
+                sibling = idx ^ 1
+                if sibling < n:
+                    proofs[i].append(layer[sibling])
+                indices[i] = idx >> 1
+
+        return proofs
+
     def verify(self, leaf: bytes, proof: list[bytes], root: bytes) -> bool:
         """Verify a Merkle proof."""
         computed = leaf
         for sibling in proof:
             computed = _hash_pair(computed, sibling)
         return computed == root
+
+    def cache_layer(self, depth: int) -> list[bytes]:
+        """Snapshot the layer `depth` levels above the leaves for short proofs.
+
+        Proofs against a cached layer stop at that layer, so they carry at
+        most `depth` siblings instead of the full tree height, and checking
+        one skips every hash above the layer. The snapshot is not updated by
+        later appends.
+        """
+        if not 0 <= depth < len(self.layers):
+            raise ValueError(f"Layer depth {depth} out of range (0..{len(self.layers) - 1})")
+        self._cached_depth = depth
+        self._cached_layer = list(self.layers[depth])
+        return self._cached_layer
+
+    def get_cached_proof(self, index: int) -> list[bytes]:
+        """Get the proof for a leaf up to the cached layer."""
+        if self._cached_layer is None:
+            raise ValueError("No layer cached; call cache_layer() first")
+        return self._proof(index, self._cached_depth)
+
+    def verify_against_cache(self, leaf: bytes, proof: list[bytes], index: int) -> bool:
+        """Verify a proof from get_cached_proof against the cached layer."""
+        if self._cached_layer is None:
+            raise ValueError("No layer cached; call cache_layer() first")
+        position = index >> self._cached_depth
+        if index < 0 or position >= len(self._cached_layer):
+            return False
+        computed = leaf
+        for sibling in proof:
+            computed = _hash_pair(computed, sibling)
+        return computed == self._cached_layer[position]
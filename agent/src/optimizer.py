@@ -1,29 +1,89 @@
 """Range optimization using oracle prices and volatility."""
 
 import math
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional speedup
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional speedup
+    njit = None
 
 
 # Uniswap v4 tick spacing constants
 TICK_SPACING_MAP = {500: 10, 3000: 60, 10000: 200}
 
+# Ticks are powers of 1.0001; hoist its log out of the conversions
+_LN_1_0001 = math.log(1.0001)
+_INV_LN_1_0001 = 1.0 / _LN_1_0001
+
 
 def price_to_tick(price: float) -> int:
     """Convert a price to the nearest Uniswap tick."""
     if price <= 0:
         raise ValueError("Price must be positive")
-    return int(math.floor(math.log(price) / math.log(1.0001)))
+    return math.floor(math.log(price) * _INV_LN_1_0001)
 
 
 def tick_to_price(tick: int) -> float:
     """Convert a tick to a price."""
-    return 1.0001**tick
+    return math.exp(tick * _LN_1_0001)
 
 
 def round_tick(tick: int, tick_spacing: int) -> int:
-    """Round a tick to the nearest valid tick (multiple of tick_spacing)."""
+    """Round a tick down to a valid tick (multiple of tick_spacing).
+
+    Floor division rounds toward negative infinity for either sign, so there
+    is no sign branch and -1 maps to -tick_spacing, never to 0.
+    """
     return (tick // tick_spacing) * tick_spacing
 
 
+def _hourly_volatility(prices) -> float:
+    """Sample standard deviation of hourly log returns, in a single pass.
+
+    Written in the subset of Python that numba can compile, so the same code
+    serves as the JIT kernel and as the pure-Python fallback.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, len(prices)):
+        prev = prices[i - 1]
+        cur = prices[i]
+        if cur > 0 and prev > 0:
+            # Welford's update keeps the fused pass numerically stable
+            r = math.log(cur / prev)
+            n += 1
+            delta = r - mean
+            mean += delta / n
+            m2 += delta * (r - mean)
+
+    if n < 2:
+        return 0.0
+    return math.sqrt(m2 / (n - 1))
+
+
+_hourly_volatility_jit = (
+    njit(cache=True)(_hourly_volatility) if njit is not None and np is not None else None
+)
+
+
+def _hourly_volatility_numpy(prices) -> float:
+    """Vectorized _hourly_volatility, for when numpy is available without numba."""
+    p = np.asarray(prices, dtype=np.float64)
+    prev, cur = p[:-1], p[1:]
+    valid = (prev > 0) & (cur > 0)
+    returns = np.log(cur[valid] / prev[valid])
+    if returns.size < 2:
+        return 0.0
+    return float(returns.std(ddof=1))
+
+
 def calculate_historical_volatility(prices: list[float]) -> float:
     """Calculate annualized historical volatility from a price series.
 
@@ -32,22 +92,15 @@ def calculate_historical_volatility(prices: list[float]) -> float:
     if len(prices) < 2:
         return 0.0
 
-    log_returns = []
-    for i in range(1, len(prices)):
-        if prices[i] > 0 and prices[i - 1] > 0:
-            log_returns.append(math.log(prices[i] / prices[i - 1]))
-
-    if not log_returns:
-        return 0.0
-
-    n = len(log_returns)
-    mean = sum(log_returns) / n
-    variance = sum((r - mean) ** 2 for r in log_returns) / (n - 1) if n > 1 else 0.0
+    if _hourly_volatility_jit is not None:
+        hourly_vol = _hourly_volatility_jit(np.asarray(prices, dtype=np.float64))
+    elif np is not None:
+        hourly_vol = _hourly_volatility_numpy(prices)
+    else:
+        hourly_vol = _hourly_volatility(prices)
 
     # Annualize (hourly data)
-    hourly_vol = math.sqrt(variance)
-    annual_vol = hourly_vol * math.sqrt(8760)
-    return annual_vol
+    return hourly_vol * math.sqrt(8760)
 
 
 def compute_optimal_range(
@@ -73,18 +126,67 @@ def compute_optimal_range(
     if volatility <= 0:
         volatility = 0.01  # minimum 1%
 
-    center_tick = price_to_tick(current_price)
+    if current_price <= 0:
+        raise ValueError("Price must be positive")
 
     # Convert annual vol to tick range
-    # price_lower = price * exp(-k * vol), price_upper = price * exp(k * vol)
-    price_lower = current_price * math.exp(-k_multiplier * volatility)
-    price_upper = current_price * math.exp(k_multiplier * volatility)
-
-    tick_lower = round_tick(price_to_tick(price_lower), tick_spacing)
-    tick_upper = round_tick(price_to_tick(price_upper), tick_spacing) + tick_spacing
+    # price_lower = price * exp(-k * vol), price_upper = price * exp(k * vol);
+    # in log space that is log(price) -/+ k * vol, so the ticks follow directly
+    # without the exp/log round trip through price_to_tick
+    log_price = math.log(current_price)
+    half_width = k_multiplier * volatility
+
+    tick_lower = round_tick(math.floor((log_price - half_width) * _INV_LN_1_0001), tick_spacing)
+    tick_upper = (
+        round_tick(math.floor((log_price + half_width) * _INV_LN_1_0001), tick_spacing)
+        + tick_spacing
+    )
 
     # Ensure valid range
     if tick_lower >= tick_upper:
         tick_upper = tick_lower + tick_spacing
 
     return tick_lower, tick_upper
+
+
+def compute_optimal_range_batch(
+    prices: "Sequence[float] | np.ndarray",
+    volatilities: "Sequence[float] | np.ndarray",
+    k_multiplier: float = 2.0,
+    tick_spacing: int = 60,
+) -> "tuple[np.ndarray, np.ndarray]":
+    """Vectorized compute_optimal_range over arrays of prices and volatilities.
+
+    Row i of the result equals compute_optimal_range(prices[i],
+    volatilities[i], k_multiplier, tick_spacing). Requires numpy.
+
+    Args:
+        prices: Current pool prices
+        volatilities: Annualized volatilities, one per price
+        k_multiplier: How many standard deviations to cover
+        tick_spacing: Pool tick spacing
+
+    Returns:
+        (tick_lower, tick_upper) as int64 arrays rounded to tick_spacing
+    """
+    if np is None:
+        raise ImportError("compute_optimal_range_batch requires numpy")
+
+    p = np.asarray(prices, dtype=np.float64)
+    vol = np.asarray(volatilities, dtype=np.float64)
+    if np.any(p <= 0):
+        raise ValueError("Price must be positive")
+    vol = np.where(vol <= 0, 0.01, vol)  # minimum 1%
+
+    log_price = np.log(p)
+    half_width = k_multiplier * vol
+
+    tick_lower = np.floor((log_price - half_width) * _INV_LN_1_0001).astype(np.int64)
+    tick_upper = np.floor((log_price + half_width) * _INV_LN_1_0001).astype(np.int64)
+    tick_lower = (tick_lower // tick_spacing) * tick_spacing
+    tick_upper = (tick_upper // tick_spacing) * tick_spacing + tick_spacing
+
+    # Ensure valid range
+    tick_upper = np.where(tick_lower >= tick_upper, tick_lower + tick_spacing, tick_upper)
+
+    return tick_lower, tick_upper
@@ -1,13 +1,38 @@
 """EIP-712 signing utilities for LP intents."""
 
-from eth_account import Account
-from eth_account.messages import encode_typed_data
+from functools import lru_cache
 
-from .types import LPIntent, EIP712_DOMAIN
+from coincurve import PrivateKey, PublicKey
+from eth_abi import encode
+from eth_utils import to_checksum_address
+
+from .hashing import keccak as _keccak, keccak_pair as _keccak_pair
+from .merkle import compute_leaf
+from .types import LPIntent, EIP712_DOMAIN, LP_INTENT_TYPE, POOL_KEY_TYPE
+
+EIP712_DOMAIN_TYPEHASH = _keccak(
+    b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+_DOMAIN_NAME_HASH = _keccak(EIP712_DOMAIN["name"].encode())
+_DOMAIN_VERSION_HASH = _keccak(EIP712_DOMAIN["version"].encode())
+_MESSAGE_TYPES = {"PoolKey": POOL_KEY_TYPE, "LPIntent": LP_INTENT_TYPE}
+
+# Largest s accepted in a signature (EIP-2 / OpenZeppelin ECDSA malleability check)
+_SECP256K1_HALF_N = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF5D576E7357A4501DDFE92F46681B20A0
+
+# Last public key recovered for each signer (lowercased address)
+PUBKEY_CACHE_SIZE = 65536
+_pubkey_cache: dict[str, bytes] = {}
 
 
 def build_eip712_message(intent: LPIntent, chain_id: int, verifying_contract: str) -> dict:
-    """Build the full EIP-712 typed data message for signing."""
+    """Build the full EIP-712 typed data message for an intent.
+
+    Signing and verification do not go through this: they hash the struct
+    directly via intent_digest(). This is the same message in the generic
+    form that wallets and eth_account's encode_typed_data expect, kept for
+    tests and debugging.
+    """
     domain = {
         **EIP712_DOMAIN,
         "chainId": chain_id,
@@ -30,33 +55,87 @@ def build_eip712_message(intent: LPIntent, chain_id: int, verifying_contract: st
         "deadline": intent.deadline,
     }
 
-    types = {
-        "PoolKey": [
-            {"name": "currency0", "type": "address"},
-            {"name": "currency1", "type": "address"},
-            {"name": "fee", "type": "uint24"},
-            {"name": "tickSpacing", "type": "int24"},
-            {"name": "hooks", "type": "address"},
-        ],
-        "LPIntent": [
-            {"name": "user", "type": "address"},
-            {"name": "pool", "type": "PoolKey"},
-            {"name": "tickLower", "type": "int24"},
-            {"name": "tickUpper", "type": "int24"},
-            {"name": "amount", "type": "uint256"},
-            {"name": "nonce", "type": "uint256"},
-            {"name": "deadline", "type": "uint256"},
-        ],
-    }
-
     return {
         "domain": domain,
-        "types": types,
+        "types": _MESSAGE_TYPES,
         "primaryType": "LPIntent",
         "message": message,
     }
 
 
+@lru_cache(maxsize=32)
+def _domain_separator(chain_id: int, verifying_contract: str) -> bytes:
+    """EIP-712 domain separator, matching Solidity's IntentVerifier.domainSeparator."""
+    return _keccak(
+        encode(
+            ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+            [
+                EIP712_DOMAIN_TYPEHASH,
+                _DOMAIN_NAME_HASH,
+                _DOMAIN_VERSION_HASH,
+                chain_id,
+                verifying_contract,
+            ],
+        )
+    )
+
+
+@lru_cache(maxsize=32)
+def _digest_prefix(chain_id: int, verifying_contract: str) -> bytes:
+    """The fixed 0x1901 || domainSeparator prefix of every intent digest in a domain."""
+    return b"\x19\x01" + _domain_separator(chain_id, verifying_contract)
+
+
+def recover_public_key(digest: bytes, signature: bytes) -> bytes:
+    """Recover the 64-byte public key behind a 65-byte r || s || v signature over a digest.
+
+    Uses libsecp256k1 (via coincurve) directly rather than eth_account's
+    recovery wrappers. Accepts exactly what OpenZeppelin's ECDSA.recover does
+    on-chain: v must be 27 or 28 and s must be in the lower half of the curve
+    order, so nothing accepted here can revert the batch.
+    """
+    if len(signature) != 65:
+        raise ValueError(f"Signature must be 65 bytes, got {len(signature)}")
+    v = signature[64]
+    if v not in (27, 28):
+        raise ValueError(f"Invalid signature recovery id: {v}")
+    if int.from_bytes(signature[32:64], "big") > _SECP256K1_HALF_N:
+        raise ValueError("Invalid signature: s is in the upper half of the curve order")
+
+    public_key = PublicKey.from_signature_and_message(
+        signature[:64] + bytes((v - 27,)), digest, hasher=None
+    )
+    return public_key.format(compressed=False)[1:]
+
+
+def public_key_to_address(public_key: bytes) -> str:
+    """Derive the checksummed address of a 64-byte public key."""
+    return to_checksum_address(_keccak(public_key)[-20:])
+
+
+def intent_digest(intent: LPIntent, chain_id: int, verifying_contract: str) -> bytes:
+    """Compute the EIP-712 digest that an intent signature covers.
+
+    Equivalent to hashing build_eip712_message() with encode_typed_data, but
+    uses the cached domain separator and the Merkle leaf, which is exactly
+    hashStruct(LPIntent), instead of re-encoding the generic typed data.
+    The digest is cached on the intent for the last domain it was computed for.
+    """
+    cached = intent._digest
+    if cached is not None and cached[0] == chain_id and cached[1] == verifying_contract:
+        return cached[2]
+
+    digest = _keccak_pair(_digest_prefix(chain_id, verifying_contract), compute_leaf(intent))
+    object.__setattr__(intent, "_digest", (chain_id, verifying_contract, digest))
+    return digest
+
+
+@lru_cache(maxsize=16)
+def _private_key(private_key: str) -> PrivateKey:
+    """Parse a hex private key once; signers reuse the same few keys."""
+    return PrivateKey(bytes.fromhex(private_key.removeprefix("0x")))
+
+
 def sign_intent(
     intent: LPIntent,
     private_key: str,
@@ -64,19 +143,12 @@ def sign_intent(
     verifying_contract: str,
 ) -> bytes:
     """Sign an LP intent with EIP-712."""
-    full_message = build_eip712_message(intent, chain_id, verifying_contract)
-
-    signable = encode_typed_data(
-        full_message=full_message,
-    )
-
-    signed = Account.sign_message(signable, private_key=private_key)
-    # Return r + s + v packed (65 bytes, matching Solidity's abi.encodePacked(r, s, v))
-    return (
-        signed.r.to_bytes(32, "big")
-        + signed.s.to_bytes(32, "big")
-        + signed.v.to_bytes(1, "big")
-    )
+    digest = intent_digest(intent, chain_id, verifying_contract)
+    # coincurve returns r + s + v (65 bytes) with v in {0, 1}; Solidity's
+    # abi.encodePacked(r, s, v) expects v in {27, 28}, so shift it in place
+    signature = bytearray(_private_key(private_key).sign_recoverable(digest, hasher=None))
+    signature[64] += 27
+    return bytes(signature)
 
 
 def verify_intent_signature(
@@ -86,11 +158,56 @@ def verify_intent_signature(
     verifying_contract: str,
 ) -> str:
     """Verify an EIP-712 signature and return the recovered address."""
-    full_message = build_eip712_message(intent, chain_id, verifying_contract)
+    digest = intent_digest(intent, chain_id, verifying_contract)
+    return public_key_to_address(recover_public_key(digest, signature))
 
-    signable = encode_typed_data(
-        full_message=full_message,
-    )
 
-    recovered = Account.recover_message(signable, signature=signature)
+def verify_intent_signature_fast(
+    intent: LPIntent,
+    signature: bytes,
+    chain_id: int,
+    verifying_contract: str,
+) -> str:
+    """Like verify_intent_signature, but skips address derivation for known signers.
+
+    The public key is still recovered every time: the contract ecrecovers the
+    same r || s || v, so a plain verify against a cached key would accept
+    signatures with a bad recovery id that then fail on-chain. What is cached
+    is the key last seen for intent.user; when the recovered key matches it,
+    the keccak and checksum of the address are skipped.
+    """
+    digest = intent_digest(intent, chain_id, verifying_contract)
+    public_key = recover_public_key(digest, signature)
+    user = intent.user.lower()
+    if _pubkey_cache.get(user) == public_key:
+        return intent.user
+
+    recovered = public_key_to_address(public_key)
+    if recovered.lower() == user:
+        if len(_pubkey_cache) >= PUBKEY_CACHE_SIZE:
+            _pubkey_cache.clear()
+        _pubkey_cache[user] = public_key
     return recovered
+
+
+def verify_intent_batch(
+    intents: list[LPIntent],
+    signatures: list[bytes],
+    chain_id: int,
+    verifying_contract: str,
+) -> list[str]:
+    """Recover the signer address of each (intent, signature) pair.
+
+    Raises ValueError on the first malformed signature.
+    """
+    if len(intents) != len(signatures):
+        raise ValueError(
+            f"Got {len(signatures)} signatures for {len(intents)} intents"
+        )
+    prefix = _digest_prefix(chain_id, verifying_contract)
+    return [
+        public_key_to_address(
+            recover_public_key(_keccak_pair(prefix, compute_leaf(intent)), signature)
+        )
+        for intent, signature in zip(intents, signatures)
+    ]
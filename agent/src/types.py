@@ -1,10 +1,19 @@
 """EIP-712 typed data structures for LP intents."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from eth_utils import to_checksum_address
 from pydantic import BaseModel
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _checksum(address: str) -> str:
+    """EIP-55 checksum an address; memoized since the same few addresses recur."""
+    return to_checksum_address(address)
+
+
+@dataclass(slots=True, frozen=True)
 class PoolKey:
     """Uniswap v4 pool key."""
 
@@ -15,9 +24,12 @@ class PoolKey:
     hooks: str  # address
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LPIntent:
-    """LP intent matching the Solidity struct."""
+    """LP intent matching the Solidity struct.
+
+    Immutable, so derived hashes can be cached on the instance.
+    """
 
     user: str  # address
     pool: PoolKey
@@ -26,6 +38,12 @@ class LPIntent:
     amount: int
     nonce: int
     deadline: int
+    # Memoized EIP-712 struct hash (Merkle leaf), filled in by merkle.compute_leaf
+    _leaf: bytes | None = field(default=None, init=False, repr=False, compare=False)
+    # Memoized (chain_id, verifying_contract, digest), filled in by signer.intent_digest
+    _digest: tuple[int, str, bytes] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
 
 class LPIntentRequest(BaseModel):
@@ -45,14 +63,18 @@ class LPIntentRequest(BaseModel):
     signature: str  # hex-encoded
 
     def to_lp_intent(self) -> LPIntent:
+        """Convert to an LPIntent, checksumming addresses once at intake.
+
+        Raises ValueError if any address is malformed.
+        """
         return LPIntent(
-            user=self.user,
+            user=_checksum(self.user),
             pool=PoolKey(
-                currency0=self.pool_currency0,
-                currency1=self.pool_currency1,
+                currency0=_checksum(self.pool_currency0),
+                currency1=_checksum(self.pool_currency1),
                 fee=self.pool_fee,
                 tick_spacing=self.pool_tick_spacing,
-                hooks=self.pool_hooks,
+                hooks=_checksum(self.pool_hooks),
             ),
             tick_lower=self.tick_lower,
             tick_upper=self.tick_upper,
@@ -62,10 +84,31 @@ class LPIntentRequest(BaseModel):
         )
 
 
+class PendingIntent(BaseModel):
+    """Public view of a pending intent."""
+
+    user: str
+    tick_lower: int
+    tick_upper: int
+    amount: str  # decimal string; uint256 overflows JS numbers
+    nonce: int
+    deadline: int
+
+
+class BatchRecord(BaseModel):
+    """A completed batch, as stored in the batch history."""
+
+    root: str
+    tx_hash: str
+    intent_count: int = 0
+    timestamp: int = 0
+
+
 class BatchStatus(BaseModel):
     """Current batch status."""
 
     pending_intents: int
+    pending_root: str | None = None  # Merkle root over the pending intents
     last_batch_root: str | None = None
     last_batch_tx: str | None = None
     batches_executed: int = 0
@@ -16,6 +16,7 @@ import os
 import sys
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from eth_account import Account
 from web3 import Web3
@@ -28,6 +29,7 @@ load_dotenv(env_path)
 # Add agent src to path
 sys.path.insert(0, str(Path(__file__).parent))
 from src.types import LPIntent, PoolKey
+from src.hashing import keccak
 from src.signer import sign_intent
 from src.merkle import MerkleTree, compute_leaf
 
@@ -40,6 +42,12 @@ COMMIT_ADDRESS = os.getenv("COMMIT_ADDRESS")
 EXECUTOR_ADDRESS = os.getenv("EXECUTOR_ADDRESS")
 CHAIN_ID = 11155111  # Sepolia
 
+# One keep-alive connection to the agent for every request in the demo
+SESSION = requests.Session()
+
+# Shared RPC client, so on-chain calls reuse pooled connections too
+W3 = Web3(Web3.HTTPProvider(RPC_URL, session=requests.Session())) if RPC_URL else None
+
 # Colors for terminal output
 GREEN = "\033[92m"
 RED = "\033[91m"
@@ -74,13 +82,13 @@ def test_api_health():
     header("TEST 1: Agent API Health Check")
 
     # Check batch status
-    r = requests.get(f"{AGENT_URL}/batch/status")
+    r = SESSION.get(f"{AGENT_URL}/batch/status")
     assert r.status_code == 200, f"Status endpoint failed: {r.status_code}"
     status = r.json()
     passed(f"GET /batch/status -> {json.dumps(status)}")
 
     # Check pending intents
-    r = requests.get(f"{AGENT_URL}/intents/pending")
+    r = SESSION.get(f"{AGENT_URL}/intents/pending")
     assert r.status_code == 200
     passed(f"GET /intents/pending -> {len(r.json())} pending")
 
@@ -108,21 +116,29 @@ def test_eip712_signing():
         hooks=HOOK_ADDRESS,
     )
 
-    intents = []
-    signatures = []
-    for i, wallet in enumerate(wallets):
-        intent = LPIntent(
+    deadline = int(time.time()) + 3600
+    intents = [
+        LPIntent(
             user=wallet.address,
             pool=pool,
             tick_lower=-887220,
             tick_upper=887220,
             amount=(100 + i * 50) * 10**18,
             nonce=i,
-            deadline=int(time.time()) + 3600,
+            deadline=deadline,
+        )
+        for i, wallet in enumerate(wallets)
+    ]
+
+    # libsecp256k1 signs without holding the GIL, so wallets sign in parallel
+    with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1)) as executor:
+        signatures = list(
+            executor.map(
+                lambda pair: sign_intent(pair[0], pair[1].key.hex(), CHAIN_ID, HOOK_ADDRESS),
+                zip(intents, wallets),
+            )
         )
-        sig = sign_intent(intent, wallet.key.hex(), CHAIN_ID, HOOK_ADDRESS)
-        intents.append(intent)
-        signatures.append(sig)
+    for i, intent in enumerate(intents):
         passed(f"Wallet {i+1} signed intent (amount={intent.amount // 10**18} tokens)")
 
     info("All intents are EIP-712 signed - cannot be forged or tampered")
@@ -169,14 +185,19 @@ def test_merkle_privacy(intents):
 def test_submit_intents(wallets, intents, signatures):
     header("TEST 4: Submit Signed Intents to Agent API")
 
+    # Every intent targets the same pool; only the per-intent fields change
+    pool = intents[0].pool
+    template = {
+        "pool_currency0": pool.currency0,
+        "pool_currency1": pool.currency1,
+        "pool_fee": pool.fee,
+        "pool_tick_spacing": pool.tick_spacing,
+        "pool_hooks": pool.hooks,
+    }
+
     for i, (intent, sig) in enumerate(zip(intents, signatures)):
-        payload = {
+        payload = template | {
             "user": intent.user,
-            "pool_currency0": intent.pool.currency0,
-            "pool_currency1": intent.pool.currency1,
-            "pool_fee": intent.pool.fee,
-            "pool_tick_spacing": intent.pool.tick_spacing,
-            "pool_hooks": intent.pool.hooks,
             "tick_lower": intent.tick_lower,
             "tick_upper": intent.tick_upper,
             "amount": intent.amount,
@@ -185,7 +206,7 @@ def test_submit_intents(wallets, intents, signatures):
             "signature": "0x" + sig.hex(),
         }
 
-        r = requests.post(f"{AGENT_URL}/intents", json=payload)
+        r = SESSION.post(f"{AGENT_URL}/intents", json=payload)
         if r.status_code == 200:
             result = r.json()
             passed(f"Intent {i+1} accepted (pending={result['pending_count']})")
@@ -194,7 +215,7 @@ def test_submit_intents(wallets, intents, signatures):
             return False
 
     # Verify pending
-    r = requests.get(f"{AGENT_URL}/intents/pending")
+    r = SESSION.get(f"{AGENT_URL}/intents/pending")
     pending = r.json()
     info(f"Agent now has {len(pending)} pending intents")
 
@@ -225,7 +246,7 @@ def test_replay_protection(intents, signatures):
         "signature": "0x" + sig.hex(),
     }
 
-    r = requests.post(f"{AGENT_URL}/intents", json=payload)
+    r = SESSION.post(f"{AGENT_URL}/intents", json=payload)
     if r.status_code == 400 and "Duplicate nonce" in r.text:
         passed("Duplicate intent correctly rejected (replay protection)")
     else:
@@ -260,7 +281,7 @@ def test_forged_signature(intents):
         "signature": fake_sig,
     }
 
-    r = requests.post(f"{AGENT_URL}/intents", json=payload)
+    r = SESSION.post(f"{AGENT_URL}/intents", json=payload)
     if r.status_code == 400:
         passed(f"Forged signature correctly rejected: {r.json()['detail'][:50]}")
     else:
@@ -312,7 +333,7 @@ def test_expired_intent():
         "signature": "0x" + sig.hex(),
     }
 
-    r = requests.post(f"{AGENT_URL}/intents", json=payload)
+    r = SESSION.post(f"{AGENT_URL}/intents", json=payload)
     if r.status_code == 400 and "deadline" in r.text.lower():
         passed("Expired intent correctly rejected")
     else:
@@ -332,7 +353,7 @@ def test_commit_reveal_onchain():
         info("Skipping on-chain test (missing RPC_URL, PRIVATE_KEY, or COMMIT_ADDRESS)")
         return True
 
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
+    w3 = W3
     if not w3.is_connected():
         info(f"Cannot connect to {RPC_URL}, skipping on-chain test")
         return True
@@ -392,7 +413,7 @@ def test_commit_reveal_onchain():
     # Create a secret intent and commit its hash
     secret_intent_data = b"LP intent: add 100 ETH liquidity to WETH/USDC at tick [-887220, 887220]"
     salt = os.urandom(32)
-    commit_hash = Web3.keccak(secret_intent_data + salt)
+    commit_hash = keccak(secret_intent_data + salt)
 
     info(f"Secret intent data: (hidden - only hash is published)")
     info(f"Commit hash: {commit_hash.hex()[:32]}...")
@@ -442,7 +463,7 @@ def test_commit_reveal_onchain():
 def test_batch_status():
     header("TEST 9: Batch Status & Agent Intelligence")
 
-    r = requests.get(f"{AGENT_URL}/batch/status")
+    r = SESSION.get(f"{AGENT_URL}/batch/status")
     status = r.json()
 
     info(f"Pending intents:  {status['pending_intents']}")
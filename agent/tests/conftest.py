@@ -0,0 +1,33 @@
+"""Shared test configuration."""
+
+import os
+
+# eth_keys picks its ECC backend when eth_account is first imported. Pin
+# libsecp256k1 (coincurve) so the reference signing in these tests fails
+# loudly rather than quietly falling back to the pure-Python backend.
+os.environ.setdefault("ECC_BACKEND_CLASS", "eth_keys.backends.CoinCurveECCBackend")
+
+# Import the hashing module before anything hashes: it points eth_hash (and so
+# Web3.keccak, eth_account, ...) at the pysha3 backend when it is installed.
+import src.hashing  # noqa: F401
+
+import pytest
+from eth_account import Account
+
+
+@pytest.fixture(scope="session")
+def rand_acct():
+    """A random account, generated once per test session."""
+    return Account.create()
+
+
+@pytest.fixture(scope="session")
+def rand_acct2():
+    """A second random account, distinct from rand_acct."""
+    return Account.create()
+
+
+@pytest.fixture(scope="session")
+def det_acct():
+    """An account with a fixed private key."""
+    return Account.from_key("0x" + "ab" * 32)
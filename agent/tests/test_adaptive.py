@@ -0,0 +1,49 @@
+"""Tests for adaptive parameter learning."""
+
+from src.adaptive import AdaptiveParams, BatchResult
+
+
+def _make_result(i: int, price_at_check: float) -> BatchResult:
+    return BatchResult(
+        batch_root=f"0x{i:064x}",
+        intent_count=3,
+        gas_used=400_000 + i * 1_000,
+        tick_lower=-600,
+        tick_upper=600,
+        price_at_entry=1.0,
+        price_at_check=price_at_check,
+    )
+
+
+def test_running_stats_match_full_history():
+    """Running gas total and recent IL match a recomputation over the history."""
+    results = [_make_result(i, 1.0 + (i % 7) * 0.01) for i in range(25)]
+    adaptive = AdaptiveParams()
+    for result in results:
+        adaptive.record_batch(result)
+
+    recent_il = [adaptive.calculate_il_score(r) for r in results[-10:]]
+    stats = adaptive.get_stats()
+    assert stats["total_batches"] == 25
+    assert stats["total_gas"] == sum(r.gas_used for r in results)
+    assert stats["recent_avg_il"] == round(sum(recent_il) / len(recent_il), 6)
+
+
+def test_stats_seeded_from_initial_history():
+    """Passing a history to the constructor seeds the running aggregates."""
+    results = [_make_result(i, 1.0 + i * 0.02) for i in range(12)]
+
+    incremental = AdaptiveParams()
+    for result in results:
+        incremental.record_batch(result)
+
+    assert AdaptiveParams(history=list(results)).get_stats() == incremental.get_stats()
+
+
+def test_price_outside_range_scores_max_il():
+    """A check price outside the position's range scores the maximum IL."""
+    adaptive = AdaptiveParams()
+    result = _make_result(0, 1.5)  # ticks +-600 span roughly 0.94 to 1.06
+
+    assert result.lower_price < 1.0 < result.upper_price
+    assert adaptive.calculate_il_score(result) == 1.0
@@ -0,0 +1,177 @@
+"""Tests for intent collection."""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.collector import IntentCollector, create_app
+from src.merkle import MerkleTree, compute_leaf
+from src.signer import sign_intent
+from src.types import LPIntentRequest
+
+
+CHAIN_ID = 31337
+VERIFYING_CONTRACT = "0x0000000000000000000000000000000000001234"
+
+
+def _make_request(acct, nonce: int = 0, **overrides) -> LPIntentRequest:
+    fields = {
+        "user": acct.address,
+        "pool_currency0": "0x0000000000000000000000000000000000001111",
+        "pool_currency1": "0x0000000000000000000000000000000000002222",
+        "pool_fee": 3000,
+        "pool_tick_spacing": 60,
+        "pool_hooks": "0x0000000000000000000000000000000000000000",
+        "tick_lower": -600,
+        "tick_upper": 600,
+        "amount": 10**18,
+        "nonce": nonce,
+        "deadline": int(time.time()) + 3600,
+        "signature": "0x" + "00" * 65,
+        **overrides,
+    }
+    request = LPIntentRequest(**fields)
+    signature = sign_intent(request.to_lp_intent(), acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+    return request.model_copy(update={"signature": "0x" + signature.hex()})
+
+
+def test_requeue_skips_intents_resubmitted_in_flight(rand_acct):
+    """A (user, nonce) submitted again while its batch was drained is queued once."""
+    collector = IntentCollector(CHAIN_ID, VERIFYING_CONTRACT)
+    collector.submit_intent(_make_request(rand_acct, nonce=1))
+    collector.submit_intent(_make_request(rand_acct, nonce=2))
+    drained, _ = collector.drain_batch()
+
+    collector.submit_intent(_make_request(rand_acct, nonce=1))
+    collector.requeue(drained)
+
+    nonces = [intent.nonce for intent, _ in collector.pending_intents]
+    assert sorted(nonces) == [1, 2]
+    assert len(collector._pending_tree.leaves) == 2
+
+
+def test_duplicate_nonce_rejected_before_recovery(monkeypatch, rand_acct):
+    """A replayed (user, nonce) is refused without paying for signature recovery."""
+    import src.collector as collector_module
+
+    collector = IntentCollector(CHAIN_ID, VERIFYING_CONTRACT)
+    collector.submit_intent(_make_request(rand_acct, nonce=1))
+
+    calls = []
+    monkeypatch.setattr(
+        collector_module, "verify_intent_signature_fast", lambda *args: calls.append(args)
+    )
+    replay = _make_request(rand_acct, nonce=1).model_copy(
+        update={"signature": "0x" + "ab" * 65}
+    )
+    with pytest.raises(HTTPException) as excinfo:
+        collector.submit_intent(replay)
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == "Duplicate nonce"
+    assert calls == []
+    assert len(collector.pending_intents) == 1
+
+
+def _assert_status_consistent(collector: IntentCollector):
+    """The reported count and root describe the same pending queue."""
+    status = collector.get_status()
+    pending = collector.pending_intents
+    assert status.pending_intents == len(pending)
+    if pending:
+        expected = MerkleTree([compute_leaf(intent) for intent, _ in pending]).root
+        assert status.pending_root == "0x" + expected.hex()
+    else:
+        assert status.pending_root is None
+
+
+def test_status_count_matches_pending_root(rand_acct):
+    """/batch/status count and root agree across submits, a drain and a requeue."""
+    collector = IntentCollector(CHAIN_ID, VERIFYING_CONTRACT)
+    _assert_status_consistent(collector)
+    for nonce in range(5):
+        collector.submit_intent(_make_request(rand_acct, nonce=nonce))
+        _assert_status_consistent(collector)
+
+    drained, _ = collector.drain_batch()
+    _assert_status_consistent(collector)
+
+    collector.submit_intent(_make_request(rand_acct, nonce=5))
+    collector.requeue(drained)
+    assert collector.get_status().pending_intents == 6
+    _assert_status_consistent(collector)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"tick_lower": 2**30, "tick_upper": 2**31},
+        {"tick_lower": -(2**23) - 1},
+        {"pool_fee": 2**24},
+        {"pool_tick_spacing": 2**23},
+        {"amount": -1},
+    ],
+)
+def test_out_of_range_intent_rejected(rand_acct, overrides):
+    """Fields outside their Solidity int24/uint24/uint256 range get a 400 at intake."""
+    collector = IntentCollector(CHAIN_ID, VERIFYING_CONTRACT)
+    request = _make_request(rand_acct).model_copy(update=overrides)
+
+    with pytest.raises(HTTPException) as excinfo:
+        collector.submit_intent(request)
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail.startswith("Invalid intent")
+    assert collector.pending_intents == []
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """An API client backed by a fresh collector."""
+    return TestClient(create_app(IntentCollector(CHAIN_ID, VERIFYING_CONTRACT)))
+
+
+def test_submit_route_accepts_valid_intent(client, rand_acct):
+    """A correctly signed intent posted as JSON is accepted."""
+    response = client.post("/intents", json=_make_request(rand_acct, nonce=1).model_dump())
+    assert response.status_code == 200
+    assert response.json() == {"status": "accepted", "pending_count": 1}
+
+
+def test_submit_route_rejects_malformed_json(client):
+    """Unparseable bodies get a 422 located at the body itself."""
+    response = client.post(
+        "/intents", content=b"{not json", headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["type"] == "json_invalid"
+    assert error["loc"] == ["body"]
+
+
+def test_submit_route_lists_missing_fields(client, rand_acct):
+    """A missing field gets a 422 naming it, in FastAPI's usual error format."""
+    body = _make_request(rand_acct).model_dump()
+    del body["nonce"]
+
+    response = client.post("/intents", json=body)
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["type"] == "missing"
+    assert error["loc"] == ["body", "nonce"]
+
+
+def test_submit_route_rejects_bad_address(client, rand_acct):
+    """A well-formed body with a malformed address is a 400, not a validation error."""
+    body = {**_make_request(rand_acct).model_dump(), "pool_hooks": "0x1234"}
+
+    response = client.post("/intents", json=body)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid address")
+
+
+def test_submit_route_documents_request_body(client):
+    """The hand-parsed route still publishes its request schema in OpenAPI."""
+    operation = client.get("/openapi.json").json()["paths"]["/intents"]["post"]
+    schema = operation["requestBody"]["content"]["application/json"]["schema"]
+    assert set(schema["required"]) == set(LPIntentRequest.model_fields)
@@ -56,3 +56,19 @@ def test_batch_root_changes_with_different_intents():
     tree2 = MerkleTree(leaves2)
 
     assert tree1.root != tree2.root
+
+
+def test_missing_abi_not_cached(monkeypatch, tmp_path):
+    """An ABI loaded before forge has built the artifact is retried, not cached empty."""
+    import json
+
+    import src.executor as executor
+
+    monkeypatch.setattr(executor, "__file__", str(tmp_path / "agent" / "src" / "executor.py"))
+    monkeypatch.setattr(executor, "_abi_cache", {})
+    assert executor._load_abi("BatchExecutor") == []
+
+    artifact = tmp_path / "out" / "BatchExecutor.sol" / "BatchExecutor.json"
+    artifact.parent.mkdir(parents=True)
+    artifact.write_text(json.dumps({"abi": [{"type": "function", "name": "executeBatch"}]}))
+    assert executor._load_abi("BatchExecutor") == [{"type": "function", "name": "executeBatch"}]
@@ -1,9 +1,23 @@
 """Tests for Merkle tree builder and proof generation."""
 
+import dataclasses
+
+import pytest
+from eth_abi import encode
 from web3 import Web3
 
-from src.types import LPIntent, PoolKey
-from src.merkle import MerkleTree, compute_leaf, _hash_pair
+from src.hashing import keccak
+from src.types import LP_INTENT_TYPE, POOL_KEY_TYPE, LPIntent, PoolKey
+from src.merkle import (
+    MerkleTree,
+    compute_leaf,
+    compute_leaves,
+    _hash_pair,
+    _hash_pool_key,
+    _pack_lp_intent,
+    LP_INTENT_TYPEHASH,
+    POOL_KEY_TYPEHASH,
+)
 
 
 def _make_intent(user_suffix: int, amount: int) -> LPIntent:
@@ -24,6 +38,12 @@ def _make_intent(user_suffix: int, amount: int) -> LPIntent:
     )
 
 
+@pytest.fixture(scope="module")
+def leaf_cache() -> list[bytes]:
+    """Leaves of four distinct intents, hashed once for the whole module."""
+    return [compute_leaf(_make_intent(i, (i + 1) * 100 * 10**18)) for i in range(1, 5)]
+
+
 def test_compute_leaf_deterministic():
     """Same intent produces same leaf hash."""
     intent = _make_intent(1, 100 * 10**18)
@@ -32,6 +52,93 @@ def test_compute_leaf_deterministic():
     assert leaf1 == leaf2
 
 
+@pytest.mark.parametrize(
+    "intent",
+    [
+        _make_intent(1, 100 * 10**18),
+        dataclasses.replace(_make_intent(2, 1), tick_lower=-120, tick_upper=-60, nonce=7),
+        dataclasses.replace(_make_intent(3, 5 * 10**17), tick_lower=60, tick_upper=600, nonce=2**64),
+    ],
+)
+def test_leaf_matches_abi_encoding(intent):
+    """Hand-packed leaf matches the eth_abi reference encoding."""
+    pool = intent.pool
+
+    pool_hash = Web3.keccak(
+        encode(
+            ["bytes32", "address", "address", "uint24", "int24", "address"],
+            [POOL_KEY_TYPEHASH, pool.currency0, pool.currency1, pool.fee, pool.tick_spacing, pool.hooks],
+        )
+    )
+    assert _hash_pool_key(
+        pool.currency0, pool.currency1, pool.fee, pool.tick_spacing, pool.hooks
+    ) == pool_hash
+
+    expected = Web3.keccak(
+        encode(
+            ["bytes32", "address", "bytes32", "int24", "int24", "uint256", "uint256", "uint256"],
+            [
+                LP_INTENT_TYPEHASH,
+                intent.user,
+                pool_hash,
+                intent.tick_lower,
+                intent.tick_upper,
+                intent.amount,
+                intent.nonce,
+                intent.deadline,
+            ],
+        )
+    )
+    assert compute_leaf(intent) == expected
+
+
+def test_typehashes_match_eip712_type_definitions():
+    """Precomputed typehashes agree with the EIP-712 type lists used for signing."""
+
+    def encode_type(name: str, fields: list[dict]) -> str:
+        return f"{name}(" + ",".join(f"{f['type']} {f['name']}" for f in fields) + ")"
+
+    pool_key = encode_type("PoolKey", POOL_KEY_TYPE)
+    assert POOL_KEY_TYPEHASH == keccak(pool_key.encode())
+    assert LP_INTENT_TYPEHASH == keccak((encode_type("LPIntent", LP_INTENT_TYPE) + pool_key).encode())
+
+
+def test_packed_intent_matches_abi_encoding_at_bounds():
+    """Fixed-layout packing matches eth_abi for extreme tick and uint256 values."""
+    intent = dataclasses.replace(
+        _make_intent(2**160 - 1, 2**256 - 1),
+        tick_lower=-887272,
+        tick_upper=887272,
+        nonce=2**256 - 1,
+        deadline=0,
+    )
+    pool_hash = b"\xab" * 32
+
+    assert _pack_lp_intent(intent, pool_hash) == encode(
+        ["bytes32", "address", "bytes32", "int24", "int24", "uint256", "uint256", "uint256"],
+        [
+            LP_INTENT_TYPEHASH,
+            intent.user,
+            pool_hash,
+            intent.tick_lower,
+            intent.tick_upper,
+            intent.amount,
+            intent.nonce,
+            intent.deadline,
+        ],
+    )
+
+
+def test_pool_key_hashed_once_per_pool():
+    """Intents sharing a pool reuse its cached struct hash."""
+    _hash_pool_key.cache_clear()
+    compute_leaves([_make_intent(i, 10**18) for i in range(1, 9)])
+
+    info = _hash_pool_key.cache_info()
+    assert info.misses == 1
+    assert info.hits == 7
+
+
 def test_different_intents_different_leaves():
     """Different intents produce different leaves."""
     intent1 = _make_intent(1, 100 * 10**18)
@@ -77,22 +184,19 @@ def test_two_element_tree():
     assert tree.verify(leaf2, proof2, tree.root)
 
 
-def test_three_element_tree():
+def test_three_element_tree(leaf_cache):
     """Three element tree: verify all proofs."""
-    intents = [_make_intent(i, (i + 1) * 100 * 10**18) for i in range(1, 4)]
-    leaves = [compute_leaf(intent) for intent in intents]
+    leaves = leaf_cache[:3]
 
     tree = MerkleTree(leaves)
 
-    for i in range(3):
-        proof = tree.get_proof(i)
+    for i, proof in enumerate(tree.all_proofs()):
         assert tree.verify(leaves[i], proof, tree.root), f"Proof failed for leaf {i}"
 
 
-def test_four_element_tree():
+def test_four_element_tree(leaf_cache):
     """Four element tree: verify all proofs."""
-    intents = [_make_intent(i, (i + 1) * 100 * 10**18) for i in range(1, 5)]
-    leaves = [compute_leaf(intent) for intent in intents]
+    leaves = leaf_cache
 
     tree = MerkleTree(leaves)
 
@@ -102,26 +206,59 @@ def test_four_element_tree():
     expected_root = _hash_pair(pair01, pair23)
     assert tree.root == expected_root
 
-    for i in range(4):
-        proof = tree.get_proof(i)
+    for i, proof in enumerate(tree.all_proofs()):
         assert tree.verify(leaves[i], proof, tree.root), f"Proof failed for leaf {i}"
 
 
-def test_invalid_proof_fails():
+def test_all_proofs_match_get_proof():
+    """all_proofs returns the same proofs as per-leaf get_proof calls."""
+    for n in range(1, 10):
+        leaves = [keccak(i.to_bytes(32, "big")) for i in range(n)]
+        tree = MerkleTree(leaves)
+        assert tree.all_proofs() == [tree.get_proof(i) for i in range(n)]
+
+
+def test_append_matches_rebuild():
+    """Appending leaves one by one yields the same layers as a fresh build."""
+    leaves = [keccak(i.to_bytes(32, "big")) for i in range(17)]
+    tree = MerkleTree(leaves[:1])
+
+    for n in range(2, len(leaves) + 1):
+        tree.append(leaves[n - 1])
+        rebuilt = MerkleTree(leaves[:n])
+        assert tree.layers == rebuilt.layers
+        assert tree.root == rebuilt.root
+        assert tree.all_proofs() == rebuilt.all_proofs()
+
+
+def test_cached_layer_verify():
+    """Short proofs verify against a cached layer; full proofs still verify against the root."""
+    leaves = [keccak(i.to_bytes(32, "big")) for i in range(11)]  # odd sizes promote nodes
+    tree = MerkleTree(leaves)
+
+    for depth in range(len(tree.layers)):
+        tree.cache_layer(depth)
+        for i, leaf in enumerate(leaves):
+            short = tree.get_cached_proof(i)
+            assert len(short) <= depth
+            assert tree.verify_against_cache(leaf, short, i)
+            assert tree.verify(leaf, tree.get_proof(i), tree.root)
+            assert not tree.verify_against_cache(keccak(b"garbage"), short, i)
+
+
+def test_invalid_proof_fails(leaf_cache):
     """Invalid proof doesn't verify."""
-    intents = [_make_intent(i, (i + 1) * 100 * 10**18) for i in range(1, 3)]
-    leaves = [compute_leaf(intent) for intent in intents]
+    leaves = leaf_cache[:2]
 
     tree = MerkleTree(leaves)
 
-    fake_sibling = Web3.keccak(b"garbage")
+    fake_sibling = keccak(b"garbage")
     assert not tree.verify(leaves[0], [fake_sibling], tree.root)
 
 
-def test_leaf_not_in_tree():
+def test_leaf_not_in_tree(leaf_cache):
     """Leaf not in tree fails verification."""
-    intents = [_make_intent(i, (i + 1) * 100 * 10**18) for i in range(1, 3)]
-    leaves = [compute_leaf(intent) for intent in intents]
+    leaves = leaf_cache[:2]
 
     tree = MerkleTree(leaves)
 
@@ -130,3 +267,28 @@ def test_leaf_not_in_tree():
 
     proof = tree.get_proof(0)  # proof for leaf[0]
     assert not tree.verify(fake_leaf, proof, tree.root)
+
+
+@pytest.fixture(scope="module")
+def large_leaves() -> list[bytes]:
+    """2^16 distinct leaves: production-scale batches, where per-hash overhead shows."""
+    return [keccak(i.to_bytes(32, "big")) for i in range(1 << 16)]
+
+
+def test_large_tree_build(large_leaves):
+    """A 2^16-leaf tree has the expected depth and valid proofs."""
+    tree = MerkleTree(large_leaves)
+
+    assert len(tree.layers) == 17
+    assert len(tree.layers[-1]) == 1
+    for i in (0, 1, 12345, len(large_leaves) - 1):
+        assert tree.verify(large_leaves[i], tree.get_proof(i), tree.root)
+
+
+def test_large_tree_build_benchmark(request, large_leaves):
+    """Tree-building throughput at 2^16 leaves (run with --benchmark-only)."""
+    pytest.importorskip("pytest_benchmark")
+    benchmark = request.getfixturevalue("benchmark")
+
+    tree = benchmark(MerkleTree, large_leaves)
+    assert tree.root == MerkleTree(large_leaves).root
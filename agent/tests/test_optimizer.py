@@ -2,12 +2,17 @@
 
 import math
 
+import pytest
+
 from src.optimizer import (
     price_to_tick,
     tick_to_price,
     round_tick,
     calculate_historical_volatility,
     compute_optimal_range,
+    compute_optimal_range_batch,
+    _hourly_volatility,
+    _hourly_volatility_numpy,
 )
 
 
@@ -28,6 +33,16 @@ def test_round_tick():
     assert round_tick(0, 60) == 0
 
 
+def test_round_tick_floors_across_zero():
+    """Rounding is toward negative infinity on both sides of zero."""
+    for spacing in (1, 10, 60, 200):
+        for tick in range(-3 * spacing, 3 * spacing + 1):
+            rounded = round_tick(tick, spacing)
+            assert rounded % spacing == 0
+            assert rounded <= tick < rounded + spacing
+    assert round_tick(-1, 60) == -60
+
+
 def test_historical_volatility_constant_price():
     """Constant prices have zero volatility."""
     prices = [100.0] * 24
@@ -53,6 +68,62 @@ def test_historical_volatility_known_series():
     assert 0.03 < vol < 0.20
 
 
+def test_historical_volatility_skips_non_positive_prices():
+    """Returns touching a non-positive price are ignored, on every code path."""
+    prices = [100.0, 101.0, 0.0, 99.0, 100.5, 102.0, 101.0]
+    expected = _hourly_volatility(prices) * math.sqrt(8760)
+
+    vol = calculate_historical_volatility(prices)
+    assert vol > 0.0
+    assert math.isclose(vol, expected, rel_tol=1e-12)
+
+
+def test_numpy_volatility_matches_pure_python():
+    """The vectorized tier agrees with the reference loop, including skipped returns."""
+    pytest.importorskip("numpy")
+    for prices in (
+        [100.0, 101.0, 0.0, 99.0, 100.5, 102.0, 101.0],
+        [100.0, 100.0, 100.0],
+        [100.0, -1.0, 100.0],
+        [1.0 + 0.001 * (i % 13) for i in range(300)],
+    ):
+        assert math.isclose(
+            _hourly_volatility_numpy(prices), _hourly_volatility(prices), rel_tol=1e-9, abs_tol=1e-15
+        )
+
+
+def test_compute_optimal_range_matches_price_band():
+    """Ticks equal converting the band edges price * exp(-/+ k * vol) with price_to_tick."""
+    for price in (0.0005, 0.37, 1.0, 2450.0, 98_000.0):
+        for volatility in (0.01, 0.082, 0.5, 1.7):
+            for k in (0.5, 2.0, 3.3):
+                for spacing in (1, 10, 60, 200):
+                    lower = price_to_tick(price * math.exp(-k * volatility))
+                    upper = price_to_tick(price * math.exp(k * volatility))
+                    expected = (
+                        round_tick(lower, spacing),
+                        round_tick(upper, spacing) + spacing,
+                    )
+                    assert compute_optimal_range(price, volatility, k, spacing) == expected
+
+
+def test_compute_optimal_range_batch_matches_scalar():
+    """Every row of the vectorized range equals the scalar computation."""
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(7)
+    prices = 10.0 ** rng.uniform(-4, 5, 1000)
+    volatilities = rng.uniform(-0.1, 2.0, 1000)  # includes non-positive vols
+    for k, spacing in ((2.0, 60), (0.5, 1), (3.3, 200)):
+        lower, upper = compute_optimal_range_batch(prices, volatilities, k, spacing)
+        expected = [
+            compute_optimal_range(p, v, k, spacing) for p, v in zip(prices, volatilities)
+        ]
+        assert list(zip(lower.tolist(), upper.tolist())) == expected
+
+    with pytest.raises(ValueError):
+        compute_optimal_range_batch([1.0, 0.0], [0.1, 0.1])
+
+
 def test_compute_optimal_range_basic():
     """Given price=2450, vol=8.2%, verify range output."""
     tick_lower, tick_upper = compute_optimal_range(
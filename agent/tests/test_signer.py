@@ -1,9 +1,22 @@
 """Tests for EIP-712 signing utilities."""
 
+import dataclasses
+
+import pytest
 from eth_account import Account
+from eth_account.messages import encode_typed_data, hash_domain
 
-from src.types import LPIntent, PoolKey
-from src.signer import sign_intent, verify_intent_signature
+from src.types import EIP712_DOMAIN, LPIntent, PoolKey
+from src.signer import (
+    _digest_prefix,
+    _domain_separator,
+    build_eip712_message,
+    intent_digest,
+    sign_intent,
+    verify_intent_batch,
+    verify_intent_signature,
+    verify_intent_signature_fast,
+)
 
 
 CHAIN_ID = 31337
@@ -28,9 +41,9 @@ def _make_test_intent(user_address: str) -> LPIntent:
     )
 
 
-def test_sign_and_verify_roundtrip():
+def test_sign_and_verify_roundtrip(rand_acct):
     """Sign an intent and verify the signature recovers the correct address."""
-    acct = Account.create()
+    acct = rand_acct
     intent = _make_test_intent(acct.address)
 
     sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
@@ -40,10 +53,76 @@ def test_sign_and_verify_roundtrip():
     assert recovered.lower() == acct.address.lower()
 
 
-def test_different_keys_different_signatures():
+def test_recovery_matches_eth_account(rand_acct):
+    """Recovered address matches eth_account's reference recovery."""
+    acct = rand_acct
+    intent = _make_test_intent(acct.address)
+    sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    signable = encode_typed_data(
+        full_message=build_eip712_message(intent, CHAIN_ID, VERIFYING_CONTRACT)
+    )
+    expected = Account.recover_message(signable, signature=sig)
+    assert verify_intent_signature(intent, sig, CHAIN_ID, VERIFYING_CONTRACT) == expected
+
+
+def test_signature_matches_eth_account_typed_data(rand_acct):
+    """Signing the cached digest matches signing the full typed data with eth_account."""
+    acct = rand_acct
+    intent = _make_test_intent(acct.address)
+
+    signable = encode_typed_data(
+        full_message=build_eip712_message(intent, CHAIN_ID, VERIFYING_CONTRACT)
+    )
+    expected = Account.sign_message(signable, private_key=acct.key)
+
+    sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+    assert sig == expected.signature
+
+
+def test_malformed_signature_rejected(rand_acct):
+    """Signatures with a bad length or recovery id raise instead of recovering."""
+    acct = rand_acct
+    intent = _make_test_intent(acct.address)
+    sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    with pytest.raises(ValueError):
+        verify_intent_signature(intent, sig[:64], CHAIN_ID, VERIFYING_CONTRACT)
+    with pytest.raises(ValueError):
+        verify_intent_signature(intent, sig[:64] + b"\xab", CHAIN_ID, VERIFYING_CONTRACT)
+
+
+def test_raw_recovery_id_rejected(rand_acct):
+    """v in {0, 1} is rejected, as OpenZeppelin's ECDSA.recover does on-chain."""
+    acct = rand_acct
+    intent = _make_test_intent(acct.address)
+    sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    raw = sig[:64] + bytes((sig[64] - 27,))
+    with pytest.raises(ValueError):
+        verify_intent_signature(intent, raw, CHAIN_ID, VERIFYING_CONTRACT)
+    with pytest.raises(ValueError):
+        verify_intent_signature_fast(intent, raw, CHAIN_ID, VERIFYING_CONTRACT)
+
+
+def test_high_s_signature_rejected(rand_acct):
+    """The malleable (n - s, flipped v) twin of a valid signature is rejected."""
+    acct = rand_acct
+    intent = _make_test_intent(acct.address)
+    sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    n = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+    high_s = (n - int.from_bytes(sig[32:64], "big")).to_bytes(32, "big")
+    twin = sig[:32] + high_s + bytes((55 - sig[64],))  # 27 <-> 28
+    with pytest.raises(ValueError):
+        verify_intent_signature(intent, twin, CHAIN_ID, VERIFYING_CONTRACT)
+    with pytest.raises(ValueError):
+        verify_intent_batch([intent], [twin], CHAIN_ID, VERIFYING_CONTRACT)
+
+
+def test_different_keys_different_signatures(rand_acct, rand_acct2):
     """Two different keys produce different signatures."""
-    acct1 = Account.create()
-    acct2 = Account.create()
+    acct1, acct2 = rand_acct, rand_acct2
 
     intent1 = _make_test_intent(acct1.address)
     intent2 = _make_test_intent(acct2.address)
@@ -54,10 +133,9 @@ def test_different_keys_different_signatures():
     assert sig1 != sig2
 
 
-def test_wrong_signer_detected():
+def test_wrong_signer_detected(rand_acct, rand_acct2):
     """Verifying with wrong expected user detects mismatch."""
-    acct = Account.create()
-    other = Account.create()
+    acct, other = rand_acct, rand_acct2
 
     intent = _make_test_intent(acct.address)
     sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
@@ -66,24 +144,101 @@ def test_wrong_signer_detected():
     assert recovered.lower() != other.address.lower()
 
 
-def test_tampered_intent_fails():
+def test_tampered_intent_fails(rand_acct):
     """Modifying intent after signing recovers wrong address."""
-    acct = Account.create()
+    acct = rand_acct
     intent = _make_test_intent(acct.address)
 
     sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
 
     # Tamper
-    intent.amount = 999 * 10**18
+    tampered = dataclasses.replace(intent, amount=999 * 10**18)
 
-    recovered = verify_intent_signature(intent, sig, CHAIN_ID, VERIFYING_CONTRACT)
+    recovered = verify_intent_signature(tampered, sig, CHAIN_ID, VERIFYING_CONTRACT)
     assert recovered.lower() != acct.address.lower()
 
 
-def test_deterministic_signatures():
+def test_intents_are_immutable_and_hashable(rand_acct):
+    """Signed intents cannot be mutated in place, and equal intents hash alike."""
+    intent = _make_test_intent(rand_acct.address)
+    sign_intent(intent, rand_acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        intent.amount = 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        intent.pool.fee = 500
+
+    # Cached hashes are not part of equality, hashing, or copies
+    fresh = _make_test_intent(rand_acct.address)
+    assert fresh == intent and hash(fresh) == hash(intent)
+    assert len({intent, fresh}) == 1
+    assert dataclasses.replace(intent, amount=1)._digest is None
+
+
+def test_fast_verification_with_cached_key(rand_acct, rand_acct2):
+    """Known signers are still checked: a forged signature for them is rejected."""
+    account, forger = rand_acct, rand_acct2
+    intent = _make_test_intent(account.address)
+    sig = sign_intent(intent, account.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    for _ in range(2):  # first call caches the key, second call hits the cache
+        recovered = verify_intent_signature_fast(intent, sig, CHAIN_ID, VERIFYING_CONTRACT)
+        assert recovered == account.address
+
+    forged = sign_intent(intent, forger.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+    recovered = verify_intent_signature_fast(intent, forged, CHAIN_ID, VERIFYING_CONTRACT)
+    assert recovered == forger.address
+
+
+def test_batch_verification_matches_single(rand_acct, rand_acct2, det_acct):
+    """Batch recovery returns the same signer as verifying one at a time."""
+    accounts = [rand_acct, rand_acct2, det_acct]
+    intents = [_make_test_intent(acct.address) for acct in accounts]
+    sigs = [
+        sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+        for intent, acct in zip(intents, accounts)
+    ]
+
+    recovered = verify_intent_batch(intents, sigs, CHAIN_ID, VERIFYING_CONTRACT)
+    assert recovered == [acct.address for acct in accounts]
+    assert recovered == [
+        verify_intent_signature(intent, sig, CHAIN_ID, VERIFYING_CONTRACT)
+        for intent, sig in zip(intents, sigs)
+    ]
+
+
+def test_domain_separator_cached_and_matches_eth_account(rand_acct):
+    """The memoized domain separator equals eth_account's and is computed once."""
+    _domain_separator.cache_clear()
+    _digest_prefix.cache_clear()
+    expected = hash_domain(
+        {**EIP712_DOMAIN, "chainId": CHAIN_ID, "verifyingContract": VERIFYING_CONTRACT}
+    )
+    assert _domain_separator(CHAIN_ID, VERIFYING_CONTRACT) == expected
+
+    intent = _make_test_intent(rand_acct.address)
+    sig = sign_intent(intent, rand_acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+    verify_intent_signature(_make_test_intent(rand_acct.address), sig, CHAIN_ID, VERIFYING_CONTRACT)
+    assert _domain_separator.cache_info().misses == 1
+
+
+def test_cached_digest_is_per_domain(rand_acct):
+    """A digest cached for one domain is not reused for another."""
+    acct = rand_acct
+    intent = _make_test_intent(acct.address)
+    sig = sign_intent(intent, acct.key.hex(), CHAIN_ID, VERIFYING_CONTRACT)
+
+    other = intent_digest(intent, CHAIN_ID + 1, VERIFYING_CONTRACT)
+    assert other != intent_digest(intent, CHAIN_ID, VERIFYING_CONTRACT)
+    assert other == intent_digest(_make_test_intent(acct.address), CHAIN_ID + 1, VERIFYING_CONTRACT)
+    assert verify_intent_signature(intent, sig, CHAIN_ID + 1, VERIFYING_CONTRACT) != acct.address
+    assert verify_intent_signature(intent, sig, CHAIN_ID, VERIFYING_CONTRACT) == acct.address
+
+
+def test_deterministic_signatures(det_acct):
     """Same key + same intent = same signature."""
-    key = "0x" + "ab" * 32
-    acct = Account.from_key(key)
+    acct = det_acct
+    key = acct.key.hex()
     intent = _make_test_intent(acct.address)
 
     sig1 = sign_intent(intent, key, CHAIN_ID, VERIFYING_CONTRACT)
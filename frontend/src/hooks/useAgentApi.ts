@@ -29,6 +29,7 @@ export interface AgentConfig {
 
 export interface BatchStatusResponse {
   pending_intents: number;
+  pending_root: string | null;
   last_batch_root: string | null;
   last_batch_tx: string | null;
   batches_executed: number;